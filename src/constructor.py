@@ -1,40 +1,44 @@
 import itertools
-import logging
-from collections import defaultdict, deque
-from pprint import pprint
-from queue import Queue
-from typing import Dict, List, Tuple, Deque, Any
-
-import numpy as np
-from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
+from collections import defaultdict
+from typing import Dict, List, Tuple, Any
+
+from qiskit import QuantumCircuit, QuantumRegister
 from qiskit.converters import circuit_to_dag
 from qiskit.dagcircuit.dagnode import DAGOpNode
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from subcircuit import Variant
 from logger import get_logger
 import time
 
 
-# possible initial states
-init_states: Dict[str, List[complex]] = {
-    '|0>': [1, 0],
-    '|1>': [0, 1],
-    '|+>': [1 / np.sqrt(2), 1 / np.sqrt(2)],
-    '|i>': [1 / np.sqrt(2), 1j / np.sqrt(2)]
+# gates preparing each possible initial state after a reset (|0>: nothing to do)
+init_gates: Dict[str, Tuple[str, ...]] = {
+    '|0>': (),
+    '|1>': ('x',),
+    '|+>': ('h',),
+    '|i>': ('h', 's'),
+}
+
+# gates rotating each measurement basis onto Z (Z/I: no transformation)
+meas_rotations: Dict[str, Tuple[str, ...]] = {
+    'I': (),
+    'Z': (),
+    'X': ('h',),
+    'Y': ('sdg', 'h'),
 }
 
 def calculate_required_qubits(
-    vertices: set,
-    dag_nodes: List[DAGOpNode], # type: ignore
-    id_mapping: Dict[int, int],
+    vertices: frozenset,
+    dag_nodes_dict: Dict[int, DAGOpNode], # type: ignore
+    qubit_sort_key: Dict[Any, Tuple[str, int]],
 ) -> Tuple[int, Dict[Any, int]]:
     """
     determines the set of physical qubits used in a subset of DAG nodes and
     assigns each a local index for subcircuit creation.
 
     :param vertices: set of vertex IDs belonging to the subcircuit
-    :param dag_nodes: list of all DAGOpNodes from the full circuit
-    :param id_mapping: mapping from original DAG node IDs to normalized node IDs
+    :param dag_nodes_dict: mapping from normalized node ID to DAGOpNode, in DAG order
+    :param qubit_sort_key: mapping from qubit to its (register name, index) sort key
     :return (number of required qubits, mapping from global to local qubit index)
     """
 
@@ -42,13 +46,12 @@ def calculate_required_qubits(
     qubits_used = set()
     
     # check which physical qubits are actually used by the selected nodes
-    for node in dag_nodes:
-        mapped_id = id_mapping[node._node_id]
+    for mapped_id, node in dag_nodes_dict.items():
         if mapped_id in vertices:
             qubits_used.update(node.qargs)
 
     # sort them by register name and index for consistency
-    sorted_qubits = sorted(qubits_used, key=lambda q: (q._register.name, q._index))
+    sorted_qubits = sorted(qubits_used, key=qubit_sort_key.__getitem__)
     qubit_mapping = {qb: local_idx for local_idx, qb in enumerate(sorted_qubits)}
     return len(sorted_qubits), qubit_mapping
 
@@ -61,62 +64,34 @@ def apply_initializations(
     """
     applies a specific initial state to selected qubits in the subcircuit
     and returns the list of (qubit_index, basis) for naming purposes.
+    The state is prepared by a reset followed by the gates in init_gates,
+    each broadcast over all the qubits.
 
     :return: list of initialized qubits with their basis
     """
-    state = init_states[init_variant]
-    initialized = {}
-    for idx in qubit_indices:
-        sub_qc.initialize(state, qreg[idx])
-        initialized[idx] = init_variant
+    if qubit_indices:
+        qubits = [qreg[idx] for idx in qubit_indices]
+        sub_qc.reset(qubits)
+        for gate in init_gates[init_variant]:
+            getattr(sub_qc, gate)(qubits)
 
-    return initialized
+    return {idx: init_variant for idx in qubit_indices}
 
 
 def append_gates(
     sub_qc: QuantumCircuit,
-    dag_nodes: List[DAGOpNode], # type: ignore
-    vertices: set,
+    sub_nodes: List[Tuple[DAGOpNode, Tuple[int, ...]]], # type: ignore
     qreg: QuantumRegister,
-    init_map: Dict[Any, str],
-    id_mapping: Dict[int, int],
-    qbit_mapping: Dict[Any, int],
-)  -> Dict[int, str]:
+) -> None:
     """
-    adds all relevant gates to the subcircuit and handles qubit initialization
-    at cut points
+    adds all the gates of the subcircuit, in DAG order, to sub_qc
 
     :param sub_qc: the subcircuit being constructed
-    :param dag_nodes: full list of DAGOpNodes
-    :param vertices: vertex ids belonging to the current subcircuit
+    :param sub_nodes: (DAGOpNode, local qubit indices) for the non measurement nodes of the subcircuit
     :param qreg: quantum register for the subcircuit
-    :param init_map: maps qbit -> initialization
-    :param id_mapping: mapping from original dag node ids to local node ids
-    :param qbit_mapping: mapping from global qubits to local indices
     """
-
-    initialized = {}
-    already_initted = set()  # track which qubits have been initialized
-
-    for node in dag_nodes:
-        mapped_id_node = id_mapping[node._node_id]
-        # skip if it's not part of this subcircuit or it's a measurement node
-        if mapped_id_node not in vertices or node.op.name.lower() == 'measure':
-            continue
-
-        # if a qubit needs initialization and hasn t been initialized yet do so once.
-        for qb in node.qargs:
-            if qb in init_map and qb not in already_initted:
-                idx = qbit_mapping[qb]
-                init_dict = apply_initializations(sub_qc, qreg, [idx], init_map[qb])
-                initialized.update(init_dict)
-                already_initted.add(qb)
-
-
-        # after possibly initializing any required qubits, append the gate only once
-        sub_qc.append(node.op, [qreg[qbit_mapping[q]] for q in node.qargs])
-
-    return initialized
+    for node, local_indices in sub_nodes:
+        sub_qc.append(node.op, [qreg[i] for i in local_indices])
 
 def append_measurements(
     sub_qc: QuantumCircuit,
@@ -131,29 +106,165 @@ def append_measurements(
 
     :param sub_qc: the subcircuit being constructed
     :param qreg: quantum register for the subcircuit
-    :param dag_nodes_dict: mapping from node ID to DAGOpNode
-    :param cuts_out: list of output cut node IDs
+    :param unique_qbs: sorted qubits involved in the cut out nodes
     :param out_combo: tuple indicating the basis for each cut
     :param qbit_mapping: mapping from global qubits to local indices
     """
     measured = {}
-    cbit_index = 0
 
     for qb, basis in zip(unique_qbs, out_combo):
         local_idx = qbit_mapping[qb]
 
-        if basis == 'X':
-            sub_qc.h(qreg[local_idx])
-        elif basis == 'Y':
-            sub_qc.sdg(qreg[local_idx])
-            sub_qc.h(qreg[local_idx])
-        # Z/I: no transformation
+        for gate in meas_rotations[basis]:
+            getattr(sub_qc, gate)(qreg[local_idx])
 
         measured[local_idx] = basis
-        cbit_index += 1
 
     return measured
 
+def generate_subcircuits(
+    sub_id: int,
+    subcircuit: Dict[str, object],
+    qc: QuantumCircuit,
+    id_mapping: Dict[int, int],
+) -> Tuple[int, Dict[str, Variant]]:
+    """
+    generates all the circuit variants of a single subcircuit. It runs in a
+    worker process, so the dag is rebuilt from qc: node ids are deterministic
+    for the same circuit, hence id_mapping still applies
+
+    :param sub_id: id of the subcircuit
+    :param subcircuit: subgraph structure of the subcircuit (see create_quantum_subcircuits)
+    :param qc: the original quantum circuit
+    :param id_mapping: mapping from original dag node ids to local node ids
+    :return (sub_id, {variant_name: Variant, ...})
+    """
+    # convert full circuit to dag for node access
+    dag = circuit_to_dag(qc)
+    # build a dict for quick node lookup, the mapped ids are resolved once here
+    dag_nodes_dict = {id_mapping[node._node_id]: node for node in dag.op_nodes()}
+    # barriers are never cut points; Qiskit op names are already lowercase
+    barrier_ids = {mapped_id for mapped_id, node in dag_nodes_dict.items() if node.op.name == 'barrier'}
+    # sort key of every qubit, to order them by register name and index
+    qb_sort_key = {qb: (qb._register.name, qb._index) for qb in dag.qubits}
+
+    logger = get_logger(f"Sub {sub_id} Logger", f"./src/output/constructor/{time.time()}sub_{sub_id}.log" )
+    local_subcircuits = {}
+
+    # extract subcircuit info
+    vertices = frozenset(subcircuit['vertices'])
+    cuts_in = sorted(n for n in subcircuit['cuts']['in'] if n not in barrier_ids)
+    cuts_out = sorted(n for n in subcircuit['cuts']['out'] if n not in barrier_ids)
+
+    unique_cut_in_qubits = sorted({
+        qb for node_id in cuts_in
+        for qb in dag_nodes_dict[node_id].qargs
+    }, key=qb_sort_key.__getitem__)
+
+    # combos are streamed, not materialized: there are 4^k of them
+    n_in_combos = len(init_gates) ** len(unique_cut_in_qubits)
+    all_in_combos = itertools.product(init_gates, repeat=len(unique_cut_in_qubits))
+
+    # get all the qbits involved in cut_out nodes
+    unique_qbs = sorted({
+        qb for node_id in cuts_out
+        for qb in dag_nodes_dict[node_id].qargs
+    }, key=qb_sort_key.__getitem__)
+
+    n_out_combos = 4 ** len(unique_qbs)
+    logger.info("Generating subcircuit %s with %d in-combos and %d out-combos", sub_id, n_in_combos, n_out_combos)
+
+    # the qubits used by the subcircuit do not depend on the combos
+    num_qubits, qbit_map = calculate_required_qubits(vertices, dag_nodes_dict, qb_sort_key)
+    qreg = QuantumRegister(num_qubits, f"q{sub_id}")
+
+    # local -> global qubit index, shared by all the variants
+    global_qubit_idx = {qb: i for i, qb in enumerate(dag.qubits)}
+    local_to_global_qbit_map = {
+        local_idx: global_qubit_idx[qb]
+        for qb, local_idx in qbit_map.items()
+    }
+    # every local qubit is active in every variant, so one list is shared
+    active_qubits = sorted(qbit_map.values())
+
+    # nodes of this subcircuit (measurements excluded) with their local qubit indices
+    sub_nodes = [
+        (node, tuple(qbit_map[qb] for qb in node.qargs))
+        for mapped_id, node in dag_nodes_dict.items()
+        if mapped_id in vertices and node.op.name != 'measure'
+    ]
+
+    # the gates are the same for every variant, only the cut_in initializations change
+    gates_qc = QuantumCircuit(qreg)
+    append_gates(gates_qc, sub_nodes, qreg)
+
+    # cut_in qubits in the order the gates first use them. A cut_in qubit is
+    # untouched before its first gate, so its initialization can go at the front
+    cut_in_set = set(unique_cut_in_qubits)
+    init_qubits = list(dict.fromkeys(
+        qb for node, _ in sub_nodes for qb in node.qargs if qb in cut_in_set
+    ))
+
+    # loop through each input combo
+    for in_combo in all_in_combos:
+        base_sub_qc = QuantumCircuit(qreg)
+
+        # initialize cut_in states
+        init_map = {
+            qb: basis for qb, basis in zip(unique_cut_in_qubits, in_combo)
+        }
+
+        # qubits sharing a basis are prepared together
+        basis_groups = defaultdict(list)
+        for qb in init_qubits:
+            basis_groups[init_map[qb]].append(qbit_map[qb])
+        for basis, idxs in basis_groups.items():
+            apply_initializations(base_sub_qc, qreg, idxs, basis)
+        base_sub_qc.compose(gates_qc, inplace=True)
+
+        # in the order the gates first use the qubits, for naming
+        initialized_info = {qbit_map[qb]: init_map[qb] for qb in init_qubits}
+
+        # for naming
+        initialized_qbs_str = "_".join([f"q{q}-{b}" for q, b in initialized_info.items()])
+
+        # a fresh iterator for each in_combo
+        for out_combo in itertools.product(['I', 'X', 'Z', 'Y'], repeat=len(unique_qbs)):
+            sub_qc_variant = base_sub_qc.copy()
+
+            measured_info = append_measurements(
+                sub_qc_variant,
+                qreg,
+                unique_qbs,
+                out_combo,
+                qbit_map,
+            )
+
+            measured_qbs_str = "_".join([f"q{q}-{b}" for q, b in measured_info.items()])
+
+
+            # name and store the variant
+            circuit_name = f"sub_{sub_id}_in_{initialized_qbs_str}_out_{measured_qbs_str}"
+
+            local_subcircuits[circuit_name] = Variant(
+                sub_id=sub_id, 
+                shots=subcircuit["shots"],
+                name=circuit_name,
+                vertices=vertices,
+                cuts_info=subcircuit["cuts_info"],
+                circuit=sub_qc_variant,
+                active_qubits=active_qubits,
+                initialized_info=initialized_info,
+                measured_info=measured_info,
+                qbit_map=local_to_global_qbit_map
+            )
+            # one line per variant: only at debug level, the logger defaults to info
+            logger.debug("Created variant %s", circuit_name)
+
+    logger.info("Subcircuit %s: generated %d variants.", sub_id, len(local_subcircuits))
+    return sub_id, local_subcircuits
+
+
 def create_quantum_subcircuits(
     subcircuits: Dict[int, Dict[str, object]],
     qc: QuantumCircuit,
@@ -180,121 +291,15 @@ def create_quantum_subcircuits(
                           }
     :param qc: the original  quantum circuit needed to know which node do waht
     :param id_mapping: mapping from original dag node ids to local node ids
-    :param max_workers: max number of threads
+    :param max_workers: max number of worker processes
     :return dictionary {sub_id: {variant_name: Variant, ...}}
     """
     
     result: Dict[int, Dict[str, Variant]] = defaultdict(dict)
 
-    # convert full circuit to dag for node access
-    dag = circuit_to_dag(qc)
-    dag_nodes = list(dag.op_nodes())
-    # build a dict for quick node lookup
-    dag_nodes_dict = {id_mapping[node._node_id]: node for node in dag_nodes}
-
-    # function to generate all circuit variants for a single subcircuit
-    def generate_subcircuits(sub_id: int, subcircuit: Dict[str, object]):
-
-        logger = get_logger(f"Sub {sub_id} Logger", f"./src/output/constructor/{time.time()}sub_{sub_id}.log" )
-        local_subcircuits = {}
-
-        # extract subcircuit info
-        vertices = set(subcircuit['vertices'])
-        cuts_in = sorted([n for n in subcircuit['cuts']['in'] if dag_nodes_dict[n].op.name.lower() != 'barrier'])
-        cuts_out = sorted([n for n in subcircuit['cuts']['out'] if dag_nodes_dict[n].op.name.lower() != 'barrier'])
-
-        unique_cut_in_qubits = sorted({
-            qb for node_id in cuts_in
-            for qb in dag_nodes_dict[node_id].qargs
-        }, key=lambda q: (q._register.name, q._index))
-
-        all_in_combos = list(itertools.product(['|0>', '|1>', '|+>', '|i>'], repeat=len(unique_cut_in_qubits)))
-
-        # get all the qbits involved in cut_out nodes
-        unique_qbs = sorted({
-            qb for node_id in cuts_out
-            for qb in dag_nodes_dict[node_id].qargs
-        }, key=lambda q: (q._register.name, q._index))
-
-        all_out_combos = list(itertools.product(['I', 'X', 'Z', 'Y'], repeat=len(unique_qbs)))
-        logger.info(f"Generating subcircuit {sub_id} with {len(all_in_combos)} in-combos and {len(all_out_combos)} out-combos")
-
-
-        # loop through each input combo
-        for in_combo in all_in_combos:
-            num_qubits, qbit_map = calculate_required_qubits(vertices, dag_nodes, id_mapping)
-            qreg = QuantumRegister(num_qubits, f"q{sub_id}")
-            base_sub_qc = QuantumCircuit(qreg)
-
-            # initialize cut_in states
-            init_map = {
-                qb: basis for qb, basis in zip(unique_cut_in_qubits, in_combo)
-            }
-
-            initialized_info = append_gates(
-                base_sub_qc,
-                dag_nodes,
-                vertices,
-                qreg,
-                init_map,
-                id_mapping,
-                qbit_map,
-            )
-
-            # for naming
-            initialized_qbs_str = "_".join([f"q{q}-{b}" for q, b in initialized_info.items()])
-            
-            for out_combo in all_out_combos:
-                sub_qc_variant = base_sub_qc.copy()
-                
-                unique_qbs = sorted({
-                    qb for node_id in cuts_out
-                    for qb in dag_nodes_dict[node_id].qargs
-                }, key=lambda q: (q._register.name, q._index))
-                
-
-                measured_info = append_measurements(
-                    sub_qc_variant,
-                    qreg,
-                    unique_qbs,
-                    out_combo,
-                    qbit_map,
-                )
-
-                # measured_qubits = sorted({qbit_map[qb] for qb in unique_qbs})
-                active_qubits = sorted(qbit_map.values())
-
-                local_to_global_qbit_map = {
-                    local_idx: dag.qubits.index(qb)
-                    for qb, local_idx in qbit_map.items()
-                }
-
-                measured_qbs_str = "_".join([f"q{q}-{b}" for q, b in measured_info.items()])
-
-
-                # name and store the variant
-                circuit_name = f"sub_{sub_id}_in_{initialized_qbs_str}_out_{measured_qbs_str}"
-
-                local_subcircuits[circuit_name] = Variant(
-                    sub_id=sub_id, 
-                    shots=subcircuit["shots"],
-                    name=circuit_name,
-                    vertices=vertices,
-                    cuts_info=subcircuit["cuts_info"],
-                    circuit=sub_qc_variant,
-                    active_qubits=active_qubits,
-                    initialized_info=initialized_info,
-                    measured_info=measured_info,
-                    qbit_map=local_to_global_qbit_map
-                )
-                logger.info(f"Created variant {circuit_name}")
-
-        logger.info(f"Subcircuit {sub_id}: generated {len(local_subcircuits)} variants.")
-        return sub_id, local_subcircuits
-    
-    # generate all subcircuits in parallel
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(generate_subcircuits, sub_id, subcircuit)
+    # generate all subcircuits in parallel, in separate processes since the work is GIL bound
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(generate_subcircuits, sub_id, subcircuit, qc, id_mapping)
                    for sub_id, subcircuit in subcircuits.items()]
         for future in as_completed(futures):
             sub_id, local_subcircuits = future.result()
@@ -1,33 +1,60 @@
 #!/usr/bin/env python3
 
+from functools import lru_cache
+
 from qiskit import QuantumCircuit
+from qiskit.circuit.library import MCXGate
 import numpy as np
 
 
-def oracle_circuit(num_qubits):
-    oracle = QuantumCircuit(num_qubits)
+def mcz_circuit(num_qubits):
+    # X-H-MCX-H-X block shared by the oracle and the diffuser
+    mcz = QuantumCircuit(num_qubits)
+
+    mcz.x(range(num_qubits))
+    mcz.h(num_qubits - 1)
+    mcz.append(MCXGate(num_qubits - 1), range(num_qubits))
+    mcz.h(num_qubits - 1)
+    mcz.x(range(num_qubits))
 
-    oracle.x(range(num_qubits))
-    oracle.h(num_qubits - 1)
-    oracle.mcx(list(range(num_qubits - 1)), num_qubits - 1)
-    oracle.h(num_qubits - 1)
-    oracle.x(range(num_qubits))
+    return mcz
 
-    return oracle
+def oracle_circuit(num_qubits):
+    return mcz_circuit(num_qubits)
+
+def diffuser_circuit(num_qubits, mcz=None):
+    if mcz is None:
+        mcz = mcz_circuit(num_qubits)
 
-def diffuser_circuit(num_qubits):
     diffuser = QuantumCircuit(num_qubits)
 
     diffuser.h(range(num_qubits))
-    diffuser.x(range(num_qubits))
-    diffuser.h(num_qubits - 1)
-    diffuser.mcx(list(range(num_qubits - 1)), num_qubits - 1)
-    diffuser.h(num_qubits - 1)
-    diffuser.x(range(num_qubits))
+    diffuser.compose(mcz, inplace=True)
     diffuser.h(range(num_qubits))
 
     return diffuser
 
+@lru_cache(maxsize=32)
+def grover_gates(num_qubits):
+    # oracle and diffuser gates, built once per number of qubits; the mcx is
+    # built once and the oracle is the block itself
+    mcz = mcz_circuit(num_qubits)
+    oracle_gate = mcz.to_gate(label='oracle')
+    diffuser_gate = diffuser_circuit(num_qubits, mcz).to_gate(label='diffuser')
+
+    return oracle_gate, diffuser_gate
+
+@lru_cache(maxsize=32)
+def grover_step_gate(num_qubits):
+    # one Grover iteration (oracle then diffuser) as a single gate
+    oracle_gate, diffuser_gate = grover_gates(num_qubits)
+
+    step = QuantumCircuit(num_qubits)
+    step.append(oracle_gate, range(num_qubits))
+    step.append(diffuser_gate, range(num_qubits))
+
+    return step.to_gate(label='grover_step')
+
 def grover_circuit(num_qubits):
 
     qc = QuantumCircuit(num_qubits, num_qubits)
@@ -36,12 +63,9 @@ def grover_circuit(num_qubits):
 
     num_iterations = int(np.round(np.pi / 4 * np.sqrt(2 ** num_qubits)))
 
-    oracle_gate = oracle_circuit(num_qubits).to_gate(label='oracle')
-    diffuser_gate = diffuser_circuit(num_qubits).to_gate(label='diffuser')
-
-    for _ in range(num_iterations):
-        qc.append(oracle_gate, range(num_qubits))
-        qc.append(diffuser_gate, range(num_qubits))
+    # all the iterations as a single repeated gate
+    if num_iterations > 0:
+        qc.append(grover_step_gate(num_qubits).repeat(num_iterations), range(num_qubits))
 
     qc.measure(range(num_qubits), range(num_qubits))
 
@@ -1,28 +1,45 @@
-from qiskit import transpile
+import os
+import sys
+from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
 from qiskit.visualization import plot_histogram
 import matplotlib.pyplot as plt
 from grover import grover_circuit
 from simple_circuit import simple_circuit
 
+# the shared transpile cache is in src, the parent of this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from transpiler import transpile_cached
 
-def run_circuit(qc, shots=1024, draw=False):
-    simulator = AerSimulator()
-    transpiled_qc = transpile(qc, simulator)
-    job = simulator.run(transpiled_qc, shots=shots)
+
+# one simulator for every call
+simulator = AerSimulator()
+
+
+def run_circuit(qcs, shots=1024, draw=False):
+    # a list of circuits is transpiled once (see transpile_cached) and run as a
+    # single job
+    single = isinstance(qcs, QuantumCircuit)
+    circuits = [qcs] if single else list(qcs)
+
+    transpiled_qcs = transpile_cached(circuits, simulator, optimization_level=0)
+    job = simulator.run(transpiled_qcs, shots=shots)
     result = job.result()
-    counts = result.get_counts()
+    counts_list = [result.get_counts(i) for i in range(len(circuits))]
 
     print('measurement results:')
-    print(counts)
+    for counts in counts_list:
+        print(counts)
 
     if draw:
-        qc.draw('mpl')
-        plot_histogram(counts)
+        for qc, counts in zip(circuits, counts_list):
+            qc.draw('mpl')
+            plot_histogram(counts)
         plt.show()
 
-    return counts
+    return counts_list[0] if single else counts_list
 
 if __name__ == '__main__':
+    qc1 = grover_circuit(3)
     qc2 = simple_circuit()
-    results_2 = run_circuit(qc2, shots=1024, draw=True)
\ No newline at end of file
+    results_1, results_2 = run_circuit([qc1, qc2], shots=1024, draw=True)
\ No newline at end of file
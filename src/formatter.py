@@ -11,45 +11,49 @@ def format_data(
 
     # scan all subcircuit IDs and their associated variant objects
     for sub_id, variant_dict in quantum_subcircuits.items():
-        str_sub_id = str(sub_id)  # keys in variants_results are stringified sub_ids
+        # keys in variants_results are stringified sub_ids
+        sub_results = variants_results.get(str(sub_id))
+        if sub_results is None:
+            continue
 
         for variant_name, variant_obj in variant_dict.items():
             # check if this variant has results available
-            if str_sub_id not in variants_results:
-                continue
-            if variant_name not in variants_results[str_sub_id]:
+            variant_results = sub_results.get(variant_name)
+            if variant_results is None:
                 continue
 
-            output_distribution = variants_results[str_sub_id][variant_name]["probabilities"]
+            # shared by all the entries of the variant
+            output_distribution = variant_results["probabilities"]
+            measured_info = variant_obj.measured_info  # use local qubit indices
+            initialized_info = variant_obj.initialized_info  # use local qubit indices
+            qbit_map = variant_obj.qbit_map
 
             # for each cut-out edge treat it as an upstream role (with measurement nodes)
-            for out_info in variant_obj.cuts_info.get("out", []):
-                cut_id = out_info["cut_id"]
-                edge = out_info["edge"]  # (source_vertex, target_vertex)
-
-                subcircuits_data.append({
+            subcircuits_data.extend(
+                {
                     "subcircuit_id": sub_id,
-                    "cut_id": cut_id,
-                    "edge": edge,
+                    "cut_id": out_info["cut_id"],
+                    "edge": out_info["edge"],  # (source_vertex, target_vertex)
                     "role": "upstream",
-                    "measurement_bases": variant_obj.measured_info,  # use local qubit indices
+                    "measurement_bases": measured_info,
                     "output_distribution": output_distribution,
-                    "bitstring_mapping": variant_obj.qbit_map
-                })
+                    "bitstring_mapping": qbit_map
+                }
+                for out_info in variant_obj.cuts_info.get("out", [])
+            )
 
             # for each cut-in edge treat it as a downstream role (with initialized qubits)
-            for in_info in variant_obj.cuts_info.get("in", []):
-                cut_id = in_info["cut_id"]
-                edge = in_info["edge"]
-
-                subcircuits_data.append({
+            subcircuits_data.extend(
+                {
                     "subcircuit_id": sub_id,
-                    "cut_id": cut_id,
-                    "edge": edge,
+                    "cut_id": in_info["cut_id"],
+                    "edge": in_info["edge"],
                     "role": "downstream",
-                    "init_states": variant_obj.initialized_info,  # use local qubit indices
+                    "init_states": initialized_info,
                     "output_distribution": output_distribution,
-                    "bitstring_mapping": variant_obj.qbit_map
-                })
+                    "bitstring_mapping": qbit_map
+                }
+                for in_info in variant_obj.cuts_info.get("in", [])
+            )
 
     return subcircuits_data
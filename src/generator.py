@@ -1,12 +1,17 @@
 import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import List, Optional, Tuple
 
 import networkx as nx
 import pennylane as qml
 from pennylane import numpy as np
-from qiskit import transpile
+from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
 
+from transpiler import transpile_cached
+
 
 
 
@@ -28,44 +33,64 @@ def clustered_chain_graph(n: int, r: int, k: int, q1: float, q2: float, seed: Op
         separators.append(separator)
 
     G = nx.disjoint_union_all(clusters + separators)
-    cluster_nodes = [[n[0] for n in G.nodes(data="subgraph") if n[1] == f"cluster_{i}"] for i in range(r)]
-    separator_nodes = [[n[0] for n in G.nodes(data="subgraph") if n[1] == f"separator_{i}"] for i in range(r - 1)]
+    # a single pass over the nodes, dispatched by their "cluster_i" / "separator_i" tag
+    cluster_nodes = [[] for _ in range(r)]
+    separator_nodes = [[] for _ in range(r - 1)]
+    for node, tag in G.nodes(data="subgraph"):
+        kind, idx = tag.rsplit("_", 1)
+        (cluster_nodes if kind == "cluster" else separator_nodes)[int(idx)].append(node)
 
     rng = np.random.default_rng(seed)
     for i, separator in enumerate(separator_nodes):
-        for s in separator:
-            for c in cluster_nodes[i] + cluster_nodes[i + 1]:
-                if rng.random() < q2:
-                    G.add_edge(s, c)
+        candidates = cluster_nodes[i] + cluster_nodes[i + 1]
+        # one draw per (separator node, candidate) pair, in the same row major
+        # order as a nested loop, so the graph does not change for a given seed
+        mask = rng.random((len(separator), len(candidates))) < q2
+        s_idx, c_idx = np.nonzero(mask)
+        G.add_edges_from(
+            (separator[s], candidates[c]) for s, c in zip(s_idx.tolist(), c_idx.tolist())
+        )
 
     return G, cluster_nodes, separator_nodes
 
 
+@lru_cache(maxsize=64)
+def all_z_observable(wires: int):
+    return qml.pauli.string_to_pauli_word("Z" * wires)
+
+
 def get_qaoa_circuit(G: nx.Graph, cluster_nodes: List[List[int]], separator_nodes: List[List[int]], params: Tuple[Tuple[float]], layers: int = 1) -> qml.tape.QuantumTape:
     wires = len(G)
     r = len(cluster_nodes)
 
+    # the edges of each cluster (with its separators) are the same in every
+    # layer, so the subgraphs are built once
+    cluster_edges = []
+    for i, c in enumerate(cluster_nodes):
+        current_separator = separator_nodes[i - 1] if i > 0 else []
+        next_separator = separator_nodes[i] if i < r - 1 else []
+        nodes = c + current_separator + next_separator
+        cluster_edges.append(list(G.subgraph(nodes).edges))
+
+    observable = all_z_observable(wires)
+
     with qml.tape.QuantumTape() as tape:
         for w in range(wires):
             qml.Hadamard(wires=w)
 
         for l in range(layers):
             gamma, beta = params[l]
+            zz_angle = 2 * gamma
+            rx_angle = 2 * beta
 
-            for i, c in enumerate(cluster_nodes):
-                current_separator = separator_nodes[i - 1] if i > 0 else []
-                next_separator = separator_nodes[i] if i < r - 1 else []
-                nodes = c + current_separator + next_separator
-                subgraph = G.subgraph(nodes)
-
-                for edge in subgraph.edges:
-                    qml.IsingZZ(2 * gamma, wires=edge)
+            for edges in cluster_edges:
+                for edge in edges:
+                    qml.IsingZZ(zz_angle, wires=edge)
 
             for w in range(wires):
-                qml.RX(2 * beta, wires=w)
+                qml.RX(rx_angle, wires=w)
 
-        observable = "Z" * wires
-        [qml.expval(qml.pauli.string_to_pauli_word(observable))]
+        [qml.expval(observable)]
 
     return tape
 
@@ -77,45 +102,88 @@ def generate_qaoa_maxcut_circuit(n: int, r: int, k: int, layers: int = 1, q1: fl
     return str(circuit.to_openqasm())
 
 
-def run_circuit(qc, shots=1024):
+# one simulator for every call
+simulator = AerSimulator()
 
 
-    simulator = AerSimulator()
-    transpiled_qc = transpile(qc, simulator)
-    job = simulator.run(transpiled_qc, shots=shots)
+def run_circuit(qc, shots=1024):
+    # a list of circuits is transpiled once (see transpile_cached) and run as a
+    # single job, with Aer running the experiments in parallel (0: as many as
+    # the available threads)
+    single = isinstance(qc, QuantumCircuit)
+    circuits = [qc] if single else list(qc)
+
+    transpiled_qcs = transpile_cached(circuits, simulator, optimization_level=0)
+    job = simulator.run(transpiled_qcs, shots=shots, max_parallel_experiments=0)
     result = job.result()
-    counts = result.get_counts()
 
-    total_counts = sum(counts.values())
-    normalized_counts = {k: v / total_counts for k, v in counts.items()}
-    count_list = [0] * (2 ** len(qc.qubits))
+    count_lists = []
+    for i, circuit in enumerate(circuits):
+        counts = result.get_counts(i)
+
+        # circuits with several classical registers have spaces in their keys
+        bitstrings = list(counts)
+        if " " in bitstrings[0]:
+            bitstrings = [bits.replace(" ", "") for bits in bitstrings]
+
+        # bitstrings -> indices without a per key int(k, 2): the keys are read
+        # as rows of ASCII digits and weighted by the powers of 2
+        width = len(bitstrings[0])
+        digits = np.array(bitstrings, dtype=f"S{width}").view(np.uint8).reshape(-1, width)
+        indices = (digits - ord("0")).astype(np.int64) @ (1 << np.arange(width - 1, -1, -1, dtype=np.int64))
+
+        # the counts are normalized while they are scattered, no intermediate dict
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        count_array = np.zeros(1 << circuit.num_qubits)
+        count_array[indices] = values * (1.0 / values.sum())
 
-    for k, v in normalized_counts.items():
-        count_list[int(k, 2)] = v
+        count_lists.append(count_array.tolist())
 
-    return count_list
+    return count_lists[0] if single else count_lists
 
 
-def generate_circuits(filename):
+def generate_circuit_from_item(item):
+    return generate_qaoa_maxcut_circuit(
+        n=item['n'],
+        r=item['r'],
+        k=item['k'],
+        layers=item['layers'],
+        seed=item['seed']
+    )
+
+
+def generate_circuits(filename, max_workers=None):
     with open(filename, 'r') as file:
         data = json.load(file)
 
-    circuits = []
-    for item in data:
-        circuit = generate_qaoa_maxcut_circuit(
-            n=item['n'],
-            r=item['r'],
-            k=item['k'],
-            layers=item['layers'],
-            seed=item['seed']
-        )
-        circuits.append(circuit)
+    # the circuits are independent, so they are generated in parallel processes
+    # (the QASM strings are cheap to send back). A single one is built inline
+    if len(data) <= 1:
+        return [generate_circuit_from_item(item) for item in data]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        circuits = list(executor.map(generate_circuit_from_item, data, chunksize=4))
 
     return circuits
 
 
 def hellinger_distance(p, q):
-    p = np.asarray(p) / np.sum(p)
-    q = np.asarray(q) / np.sum(q)
-    return np.sqrt(0.5 * np.sum((np.sqrt(p) - np.sqrt(q)) ** 2))
+    p = np.asarray(p, dtype=np.float64)
+    q = np.asarray(q, dtype=np.float64)
+    # square roots and difference are computed in place on the two normalized
+    # copies (the inputs are left untouched), then squared-summed by a single dot
+    d = p * (1.0 / p.sum())
+    np.sqrt(d, out=d)
+    e = q * (1.0 / q.sum())
+    np.sqrt(e, out=e)
+    np.subtract(d, e, out=d)
+    return math.sqrt(0.5 * np.dot(d, d))
+
+
+def hellinger_batch(P, Q):
+    # row by row hellinger distances of two 2D arrays of distributions
+    P = np.asarray(P, dtype=np.float64)
+    Q = np.asarray(Q, dtype=np.float64)
+    d = np.sqrt(P / P.sum(axis=1, keepdims=True)) - np.sqrt(Q / Q.sum(axis=1, keepdims=True))
+    return np.sqrt(0.5 * np.einsum('ij,ij->i', d, d))
 
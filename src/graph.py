@@ -1,4 +1,4 @@
-from qiskit.dagcircuit import DAGCircuit, DAGOpNode
+from qiskit.dagcircuit import DAGCircuit
 from typing import Dict, Tuple, List, Set
 
 
@@ -28,10 +28,48 @@ def extract_graph_data(
         for node in dag.op_nodes()
     }
 
-    edges: Set[Tuple[int, int]] = {
-        (id_mapping[u._node_id], id_mapping[v._node_id])
-        for u, v, _ in dag.edges()
-        if isinstance(u, DAGOpNode) and isinstance(v, DAGOpNode)
-    }
+    return vertex_weights, map_dag_edges(dag, id_mapping)
+
+
+def map_dag_edges(
+    dag: DAGCircuit,
+    id_mapping: Dict[int, int]
+) -> List[Tuple[int, int]]:
+    """
+    edges between op nodes of a DAGCircuit, using local indices. Only op nodes
+    are in id_mapping, so a lookup miss replaces the isinstance checks
+
+    :param dag: Qiskit DAGCircuit.
+    :param id_mapping: mapping from original DAG node IDs to local IDs.
+    """
+    edges: Set[Tuple[int, int]] = set()
+    for u, v, _ in dag.edges():
+        u_id = id_mapping.get(u._node_id)
+        v_id = id_mapping.get(v._node_id)
+        if u_id is not None and v_id is not None:
+            edges.add((u_id, v_id))
+
+    return list(edges)
+
+
+def build_graph_data(
+    dag: DAGCircuit
+) -> Tuple[Dict[int, int], Dict[int, int], List[Tuple[int, int]]]:
+    """
+    get_dag_mapping and extract_graph_data in a single pass over the op nodes
+    and a single pass over the edges.
+
+    :param dag: Qiskit DAGCircuit.
+
+    :returns: A tuple containing:
+        - id_mapping: mapping from original DAG node IDs to local IDs
+        - vertex_weights: a dictionary mapping node ID to its weight (number of qargs)
+        - edges: edges of the dag using local indices
+    """
+    id_mapping: Dict[int, int] = {}
+    vertex_weights: Dict[int, int] = {}
+    for new_id, node in enumerate(dag.op_nodes()):
+        id_mapping[node._node_id] = new_id
+        vertex_weights[new_id] = len(node.qargs)
 
-    return vertex_weights, list(edges)
+    return id_mapping, vertex_weights, map_dag_edges(dag, id_mapping)
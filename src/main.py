@@ -1,12 +1,13 @@
 import logging
 import pprint
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from matplotlib import pyplot as plt
 
 from qiskit import QuantumCircuit
 
 from formatter import format_data
 from runner import run_circuit_list
-from graph import get_dag_mapping, extract_graph_data
+from graph import build_graph_data
 from merge import merge_and_normalize_variant_counts
 from model import CutAndShootModel
 from qiskit.converters import circuit_to_dag
@@ -19,33 +20,34 @@ DEBUG = True
 logger = get_logger("main_logger", "./src/output/main.log", level=logging.DEBUG)
 pp = pprint.PrettyPrinter(indent=2)
 
+QPU_TYPES = (
+    'aer_simulator',
+    'aer_simulator_statevector',
+    'ibmq_qasm_simulator',
+    'ibm_nairobi',
+    'ibm_oslo',
+)
+
+# (exec_time, queue_time, capacity)
+QPU_OVERRIDE_PARAMS = {
+    'aer_simulator': (10, 1, 70),
+    'aer_simulator_statevector': (12, 2, 70),
+    'ibmq_qasm_simulator': (70, 3, 70),
+    'ibm_nairobi': (3, 6, 50),
+    'ibm_oslo': (100, 100, 100),
+}
+
 def create_qpus():
     """Creates a list of QPUs and optionally overrides their metrics."""
-    qpu_types = [
-        'aer_simulator',
-        'aer_simulator_statevector',
-        'ibmq_qasm_simulator',
-        'ibm_nairobi',
-        'ibm_oslo',
-    ]
-
-    qpu_override_params = {
-        'aer_simulator': (10, 1, 70),
-        'aer_simulator_statevector': (12, 2, 70),
-        'ibmq_qasm_simulator': (70, 3, 70),
-        'ibm_nairobi': (3, 6, 50),
-        'ibm_oslo': (100, 100, 100),
-    }
-
     qpus = []
-    for i, qpu_type in enumerate(qpu_types):
+    for i, qpu_type in enumerate(QPU_TYPES):
         qpu = QPU(qpu_type, i)
-        if qpu_type in qpu_override_params:
-            exec_time, queue_time, capacity = qpu_override_params[qpu_type]
-            qpu.update_metrics(exec_time, queue_time, capacity)
+        params = QPU_OVERRIDE_PARAMS.get(qpu_type)
+        if params is not None:
+            qpu.update_metrics(*params)
         qpus.append(qpu)
     
-    logger.info(f"Created {len(qpus)} QPUs")
+    logger.info("Created %d QPUs", len(qpus))
     return qpus
 
 def main():
@@ -57,31 +59,33 @@ def main():
     logger.debug("Loaded and parsed quantum circuit")
     # qc.draw('mpl')
     # plt.show()
-    logger.debug(qc.draw(output="text").single_string())
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(qc.draw(output="text").single_string())
 
     # qc = simple_circuit.simple_circuit()
     dag = circuit_to_dag(qc)
-    id_mapping = get_dag_mapping(dag)
-    vertex_weights, edges = extract_graph_data(dag, id_mapping)
+    id_mapping, vertex_weights, edges = build_graph_data(dag)
     logger.debug("Extracted graph data from DAG")
 
-    logger.debug("Weights:\n%s", pp.pformat(vertex_weights))
-    logger.debug("ID Mapping:\n%s", pp.pformat(id_mapping))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Weights:\n%s", pp.pformat(vertex_weights))
+        logger.debug("ID Mapping:\n%s", pp.pformat(id_mapping))
 
     # create QPUs
     qpus = create_qpus()
 
-    logger.debug("\nNode information (using local indexes):")
-    for node in dag.op_nodes():
-        local_index = id_mapping[node._node_id]
-        logger.debug(f"Local index: {local_index}")
-        logger.debug(f"  Node: {node.name}")
-        logger.debug(f"  Operation: {node.op}")
-        if hasattr(node.op, "params"):
-            logger.debug(f"  Parameters: {node.op.params}")
-        logger.debug(f"  Qubits: {node.qargs}")
-        logger.debug(f"  Condition: {node.condition}")
-        logger.debug("-" * 40)
+    if logger.isEnabledFor(logging.DEBUG):
+        lines = ["\nNode information (using local indexes):"]
+        for node in dag.op_nodes():
+            lines.append(f"Local index: {id_mapping[node._node_id]}")
+            lines.append(f"  Node: {node.name}")
+            lines.append(f"  Operation: {node.op}")
+            if hasattr(node.op, "params"):
+                lines.append(f"  Parameters: {node.op.params}")
+            lines.append(f"  Qubits: {node.qargs}")
+            lines.append(f"  Condition: {node.condition}")
+            lines.append("-" * 40)
+        logger.debug("\n".join(lines))
 
 
     # solve the model using CutAndShootModel
@@ -100,34 +104,47 @@ def main():
     # generate all variants of the subcircuits
     quantum_subcircuits = create_quantum_subcircuits(subcircuits, qc, id_mapping=id_mapping)
     
-    for sub_id, sub_variants_dict in quantum_subcircuits.items():
-        logger.debug(f"================ Subcircuit {sub_id} ================\n")
-        for variant_name, variant in sub_variants_dict.items():
-            logger.debug(f"\n{variant_name}\n")
-            logger.debug(f"\n{variant.__repr__()}\n")
-            logger.debug(variant.circuit.draw(output="text").single_string())
-            logger.debug("\n\n")
+    if logger.isEnabledFor(logging.DEBUG):
+        for sub_id, sub_variants_dict in quantum_subcircuits.items():
+            logger.debug("================ Subcircuit %s ================\n", sub_id)
+            for variant_name, variant in sub_variants_dict.items():
+                logger.debug("\n%s\n", variant_name)
+                logger.debug("\n%r\n", variant)
+                logger.debug(variant.circuit.draw(output="text").single_string())
+                logger.debug("\n\n")
 
     # asign subcircuit variants to QPUs
-    qpu_assignments = {qpu.index: [] for qpu in qpus}
+    # qpu indexes are positions in the qpus list
+    qpu_assignments = [[] for _ in qpus]
     for subcircuit_id, variants in quantum_subcircuits.items():
-        for qpu_index, shots in subcircuits[subcircuit_id]['shots'].items():
-            if shots > 0:
-                for name, variant in variants.items():
-                    variant.shots = shots
-                    qpu_assignments[qpu_index].append(variant)
+        active = [(qpu_index, shots) for qpu_index, shots in subcircuits[subcircuit_id]['shots'].items() if shots > 0]
+        if not active:
+            continue
+        variant_list = list(variants.values())
+        for qpu_index, shots in active:
+            for variant in variant_list:
+                variant.shots = shots
+            qpu_assignments[qpu_index].extend(variant_list)
 
     logger.debug("Assigned subcircuits to QPUs")
 
-    # run each QPU's circuits and collect results
+    # run each QPU's circuits in parallel, backends are independent of each other
     qpu_mapping = {qpu.index: qpu for qpu in qpus}
+    active_assignments = {
+        qpu_index: circuit_data
+        for qpu_index, circuit_data in enumerate(qpu_assignments)
+        if circuit_data
+    }
     result_list = []
-    for qpu_index, circuit_data in qpu_assignments.items():
-        if not circuit_data:
-            continue
-        logger.info(f"Running {len(circuit_data)} variants on QPU {qpu_index}")
-        results = run_circuit_list(circuit_data, backend=qpu_mapping[qpu_index].backend)
-        result_list.append(results)
+    if active_assignments:
+        with ThreadPoolExecutor(max_workers=len(active_assignments)) as executor:
+            futures = {}
+            for qpu_index, circuit_data in active_assignments.items():
+                logger.info("Running %d variants on QPU %s", len(circuit_data), qpu_index)
+                future = executor.submit(run_circuit_list, circuit_data, backend=qpu_mapping[qpu_index].backend)
+                futures[future] = qpu_index
+            for future in as_completed(futures):
+                result_list.append(future.result())
 
     logger.debug("Collected results from all QPUs")
 
@@ -138,7 +155,8 @@ def main():
     logger.debug("Formatted final data for reconstruction")
 
     logger.info("Execution completed successfully")
-    logger.debug(pp.pformat(formatted_data))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(pp.pformat(formatted_data))
 
 
 
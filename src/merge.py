@@ -1,6 +1,8 @@
-from collections import defaultdict, Counter
+from collections import defaultdict
 from typing import List, Dict, Any
 
+import numpy as np
+
 
 def merge_and_normalize_variant_counts(
     qpu_results_list: List[Dict[str, Dict[str, Any]]],
@@ -9,33 +11,39 @@ def merge_and_normalize_variant_counts(
     merges results of subcircuits run across multiple QPUs.
     Each variant is merged by summing counts and normalizing based on total shots.
 
-    :param qpu_results_list: List of QPU results.
+    :param qpu_results_list: List of QPU results, as returned by run_circuit_list.
     :return: Dict of {sub_id: {
         variant_name: {
             'probabilities': {bitstring: prob}
         }
     }}
     """
-    merged_counts = defaultdict(Counter)
+    merged_idx = defaultdict(list)
+    merged_counts = defaultdict(list)
+    num_bits_per_variant = {}
     total_shots_per_variant = defaultdict(int)
 
-    # accumulate counts and collect total shots
+    # collect the counts of every run and the total shots
     for qpu_result in qpu_results_list:
         for variant_name, data in qpu_result.items():
-            counts = data.get("counts", {})
-            total_shots = data.get("total_shots", sum(counts.values()))
-            merged_counts[variant_name].update(counts)
-            total_shots_per_variant[variant_name] += total_shots
+            merged_idx[variant_name].append(data["idx"])
+            merged_counts[variant_name].append(data["counts"])
+            num_bits_per_variant[variant_name] = data["num_bits"]
+            total_shots_per_variant[variant_name] += data["total_shots"]
 
-    # normalize and organize results by sub_id
+    # sum, normalize and organize results by sub_id
     final_results = defaultdict(dict)
-    for variant_name, counts in merged_counts.items():
+    for variant_name, idx_parts in merged_idx.items():
         sub_id = variant_name.split("_")[1]
         total_shots = total_shots_per_variant[variant_name]
-        probabilities = {
-            bitstring: count / total_shots
-            for bitstring, count in sorted(counts.items())
-        }
+        # outcomes seen by several runs are summed in a single bincount
+        idx, inverse = np.unique(np.concatenate(idx_parts), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate(merged_counts[variant_name]))
+        width = num_bits_per_variant[variant_name]
+        probabilities = dict(zip(
+            (format(i, f"0{width}b") for i in idx.tolist()),
+            (counts * (1.0 / total_shots)).tolist()
+        ))
         final_results[sub_id][variant_name] = {
             "probabilities": probabilities,
         }
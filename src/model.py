@@ -1,8 +1,24 @@
 import logging
+import math
+
 import pulp
 
 from logger import get_logger
 
+logger = logging.getLogger(__name__)
+
+# default solvers, fastest first; CBC ships with PuLP and is always the fallback
+SOLVER_PREFERENCE = (pulp.GUROBI_CMD, pulp.HiGHS_CMD, pulp.HiGHS, pulp.PULP_CBC_CMD)
+
+# keyword arguments each default solver takes, the others are not passed to it
+# (pulp.HiGHS would forward them to highspy as unknown options)
+SOLVER_OPTIONS = {
+    pulp.GUROBI_CMD: ("gapRel", "timeLimit", "threads", "warmStart"),
+    pulp.HiGHS_CMD: ("gapRel", "timeLimit", "threads", "warmStart"),
+    pulp.HiGHS: ("gapRel", "timeLimit", "threads"),
+    pulp.PULP_CBC_CMD: ("gapRel", "timeLimit", "threads", "warmStart"),
+}
+
 class CutAndShootModel:
     def __init__(
         self,
@@ -48,6 +64,7 @@ class CutAndShootModel:
         self.subcircuits = range(self.num_subcircuits)
 
         self.problem = pulp.LpProblem("Cut&Shoot", pulp.LpMinimize)
+        self.solver_class = None
 
         # variables
         self.add_variables()
@@ -62,19 +79,25 @@ class CutAndShootModel:
         """
         definition of the model variables
         """
+        # the tuple indexed variables are built in a single pass, without the
+        # index lists of LpVariable.dicts, but with the same names: y_(v,_c)
+
         # y[v,c]: 1 if gate v belongs to subcircuit c, 0 otherwise
-        self.y = pulp.LpVariable.dicts(
-            "y",
-            [(v, c) for v in self.vertices for c in self.subcircuits],
-            cat=pulp.LpBinary
-        )
+        # symmetry breaking: subcircuits are labelled in the order of their
+        # first vertex, so the i-th vertex can only belong to a subcircuit
+        # c <= i and y[v,c] with c > i is never created (it would be fixed
+        # to 0). Missing y entries are read as 0, see y.get
+        self.y = {
+            (v, c): pulp.LpVariable(f"y_{(v, c)}", cat=pulp.LpBinary)
+            for i, v in enumerate(self.vertices) for c in self.subcircuits
+            if c <= i
+        }
 
         # x[e,c]: 1 if the edge e is cut by subcircuit c, 0 otherwise
-        self.x = pulp.LpVariable.dicts(
-            "x",
-            [(e, c) for e in self.edges for c in self.subcircuits],
-            cat=pulp.LpBinary
-        )
+        self.x = {
+            (e, c): pulp.LpVariable(f"x_{(e, c)}", cat=pulp.LpBinary)
+            for e in self.edges for c in self.subcircuits
+        }
 
         # a[c]: number of qubits entering subcircuit c
         # p[c]: additional initialization qubits for subcircuit c
@@ -87,30 +110,19 @@ class CutAndShootModel:
         self.f = pulp.LpVariable.dicts("f", self.subcircuits, cat=pulp.LpInteger)
         self.d = pulp.LpVariable.dicts("d", self.subcircuits, cat=pulp.LpInteger)
 
-        # z_p[e,c] = x[e,c] * y[e[1], c]
-        # z_o[e,c] = x[e,c] * y[e[0], c]
-        self.z_p = pulp.LpVariable.dicts(
-            "z_p",
-            [(e, c) for e in self.edges for c in self.subcircuits],
-            cat=pulp.LpBinary
-        )
-        self.z_o = pulp.LpVariable.dicts(
-            "z_o",
-            [(e, c) for e in self.edges for c in self.subcircuits],
-            cat=pulp.LpBinary
-        )
-
         # u[c] = 1 if subcircuit c is actually used (has qubits), 0 otherwise
         self.u = pulp.LpVariable.dicts("u", self.subcircuits, cat=pulp.LpBinary)
 
         # shots_assign[c,q] = number of shots of subcircuit c assigned to QPU q
-        self.shots_assign = pulp.LpVariable.dicts(
-            "shots_assign",
-            [(c, q) for c in self.subcircuits for q in self.qpus_index],
-            lowBound=0,
-            upBound=self.num_shots_per_subcircuit,
-            cat=pulp.LpInteger
-        )
+        self.shots_assign = {
+            (c, q): pulp.LpVariable(
+                f"shots_assign_{(c, q)}",
+                lowBound=0,
+                upBound=self.num_shots_per_subcircuit,
+                cat=pulp.LpInteger
+            )
+            for c in self.subcircuits for q in self.qpus_index
+        }
 
         # use_q[q] = 1 if QPU q is used by at least one subcircuit, 0 otherwise
         self.use_q = pulp.LpVariable.dicts(
@@ -131,11 +143,10 @@ class CutAndShootModel:
         self.T = pulp.LpVariable("Makespan", lowBound=0, cat=pulp.LpInteger)
 
         # abilita[c,q]: 1 if QPU q can run subcircuit c
-        self.abilita = pulp.LpVariable.dicts(
-            'abilita',
-            [(c, q) for c in self.subcircuits for q in self.qpus_index],
-            cat=pulp.LpBinary
-        )
+        self.abilita = {
+            (c, q): pulp.LpVariable(f"abilita_{(c, q)}", cat=pulp.LpBinary)
+            for c in self.subcircuits for q in self.qpus_index
+        }
 
     def add_constraints(self):
         """
@@ -145,22 +156,38 @@ class CutAndShootModel:
         vertices = self.vertices
         subcircuits = self.subcircuits
         qpus_index = self.qpus_index
+        vertex_weight_items = list(self.vertex_weights.items())
+
+        # out-degree minus in-degree of each vertex, the coefficients of y in
+        # the balance of the cut edges below
+        edge_balance = {}
+        for src, dst in edges:
+            edge_balance[src] = edge_balance.get(src, 0) + 1
+            edge_balance[dst] = edge_balance.get(dst, 0) - 1
+        edge_balance_items = [(v, b) for v, b in edge_balance.items() if b != 0]
+
+        # the sums below are built straight from (variable, coefficient) pairs,
+        # edges and variable keys are unique so no pair is repeated
 
         # constraints on a[c], p[c], o[c], f[c], d[c]
         for c in subcircuits:
             # a[c] = sum of the weights of vertices assigned to subcircuit c
             self.problem += (
-                self.a[c] == pulp.lpSum(self.vertex_weights[v]*self.y[v, c] for v in vertices),
+                self.a[c] == pulp.LpAffineExpression([(self.y[v, c], w) for v, w in vertex_weight_items if (v, c) in self.y]),
                 f"A_{c}"
             )
-            # p[c] = sum of z_p[e,c]
+            # p[c] = sum of x[e,c] * y[e[1],c] and o[c] = sum of x[e,c] * y[e[0],c]
+            # x[e,c] = |y[e[0],c] - y[e[1],c]| (see the edge constraints), so the
+            # products are (x - y_src + y_dst) / 2 and (x + y_src - y_dst) / 2
+            # and need no linearization variables
+            cut_sum = pulp.LpAffineExpression([(self.x[e, c], 1) for e in edges])
+            balance = pulp.LpAffineExpression([(self.y[v, c], b) for v, b in edge_balance_items if (v, c) in self.y])
             self.problem += (
-                self.p[c] == pulp.lpSum(self.z_p[(e, c)] for e in edges),
+                2 * self.p[c] == cut_sum - balance,
                 f"P_{c}"
             )
-            # o[c] = sum of z_o[e,c]
             self.problem += (
-                self.o[c] == pulp.lpSum(self.z_o[(e, c)] for e in edges),
+                2 * self.o[c] == cut_sum + balance,
                 f"O_{c}"
             )
             # f[c] = a[c] + p[c] - o[c]
@@ -174,70 +201,52 @@ class CutAndShootModel:
                 f"D_{c}"
             )
 
-        # lnearization constraints for z_p and z_o
-        for e in edges:
-            for c in subcircuits:
-                # z_p = x[e,c] * y[e[1], c]
-                self.problem += (
-                    self.z_p[(e, c)] <= self.x[(e, c)],
-                    f"zp_1_{e}_{c}"
-                )
-                self.problem += (
-                    self.z_p[(e, c)] <= self.y[e[1], c],
-                    f"zp_2_{e}_{c}"
-                )
-                self.problem += (
-                    self.z_p[(e, c)] >= self.x[(e, c)] + self.y[e[1], c] - 1,
-                    f"zp_3_{e}_{c}"
-                )
-
-                # z_o = x[e,c] * y[e[0], c]
-                self.problem += (
-                    self.z_o[(e, c)] <= self.x[(e, c)],
-                    f"zo_1_{e}_{c}"
-                )
-                self.problem += (
-                    self.z_o[(e, c)] <= self.y[e[0], c],
-                    f"zo_2_{e}_{c}"
-                )
-                self.problem += (
-                    self.z_o[(e, c)] >= self.x[(e, c)] + self.y[e[0], c] - 1,
-                    f"zo_3_{e}_{c}"
-                )
+        # the constraints of the blocks below are collected in a dict and
+        # added to the problem at once (see extend_constraints)
 
         # every vertex must be in exactly one subcircuit
-        for v in vertices:
-            self.problem += (
-                pulp.lpSum(self.y[v, c] for c in subcircuits) == 1,
-                f"Unique_vertex_{v}"
-            )
+        self.extend_constraints({
+            f"Unique_vertex_{v}": pulp.LpAffineExpression([(self.y[v, c], 1) for c in subcircuits if (v, c) in self.y]) == 1
+            for v in vertices
+        })
+
+        # symmetry breaking, with subcircuits labelled in the order of their
+        # first vertex (the first vertex can only be in subcircuit 0, see
+        # add_variables):
+        # - the used subcircuits are a prefix, u[c] >= u[c+1]
+        # - the i-th vertex can be in subcircuit c > 0 only if one of the
+        #   vertices before it is in subcircuit c-1
+        symmetry = {
+            f"Used_prefix_{c}": self.u[c] >= self.u[c + 1]
+            for c in subcircuits[:-1]
+        }
+        for c in subcircuits[1:]:
+            previous_terms = []
+            for v in vertices:
+                if (v, c) in self.y:
+                    symmetry[f"Representative_{v}_{c}"] = self.y[v, c] <= pulp.LpAffineExpression(previous_terms)
+                if (v, c - 1) in self.y:
+                    previous_terms.append((self.y[v, c - 1], 1))
+        self.extend_constraints(symmetry)
 
         # wdge constraints: cannot cut an edge if both endpoints are in the same subcircuit
+        # the endpoints of each edge as positions in the vertex list, so that
+        # y is read from a per subcircuit list instead of the tuple keyed dict
+        vertex_pos = {v: i for i, v in enumerate(vertices)}
+        edge_ends = [(e, str(e), vertex_pos[e[0]], vertex_pos[e[1]]) for e in edges]
+        edge_cut = {}
         for c in subcircuits:
-            for e in edges:
-                self.problem += (
-                    self.x[e, c] <= self.y[e[0], c] + self.y[e[1], c],
-                    f"x_1_{e}_{c}"
-                )
-                self.problem += (
-                    self.x[e, c] >= self.y[e[0], c] - self.y[e[1], c],
-                    f"x_2_{e}_{c}"
-                )
-                self.problem += (
-                    self.x[e, c] >= self.y[e[1], c] - self.y[e[0], c],
-                    f"x_3_{e}_{c}"
-                )
-                self.problem += (
-                    self.x[e, c] <= 2 - self.y[e[0], c] - self.y[e[1], c],
-                    f"x_4_{e}_{c}"
-                )
-
-        # ordering constraint (as provided)
-        for k in range(self.num_subcircuits):
-            self.problem += (
-                pulp.lpSum(self.y[(k, j)] for j in range(k+1, self.num_subcircuits)) == 0,
-                f"Ordering_subc_{k}"
-            )
+            y_c = [self.y.get((v, c), 0) for v in vertices]
+            for e, e_name, src, dst in edge_ends:
+                x = self.x[e, c]
+                y_src = y_c[src]
+                y_dst = y_c[dst]
+
+                edge_cut[f"x_1_{e_name}_{c}"] = x <= y_src + y_dst
+                edge_cut[f"x_2_{e_name}_{c}"] = x >= y_src - y_dst
+                edge_cut[f"x_3_{e_name}_{c}"] = x >= y_dst - y_src
+                edge_cut[f"x_4_{e_name}_{c}"] = x <= 2 - y_src - y_dst
+        self.extend_constraints(edge_cut)
 
         # big M for constraints
         BigM_d = sum(self.vertex_weights.values())  # A large value based on the total number of gates
@@ -249,11 +258,15 @@ class CutAndShootModel:
                 f"Active_subcircuit_{c}"
             )
 
+        # shots_assign[c,q] by subcircuit and by QPU, reused below
+        shots_by_subcircuit = [[(self.shots_assign[(c, q)], 1) for q in qpus_index] for c in subcircuits]
+        shots_by_qpu = [[(self.shots_assign[(c, q)], 1) for c in subcircuits] for q in qpus_index]
+
         # constraints on the number of shots
         for c in subcircuits:
             # we do not assign shots to an empty subcircuit
             self.problem += (
-                pulp.lpSum(self.shots_assign[(c, q)] for q in qpus_index)
+                pulp.LpAffineExpression(shots_by_subcircuit[c])
                 == self.num_shots_per_subcircuit * self.u[c],
                 f"Total_shots_subc_{c}"
             )
@@ -262,17 +275,32 @@ class CutAndShootModel:
         M_shots = self.num_subcircuits * self.num_shots_per_subcircuit
         for q in qpus_index:
             self.problem += (
-                pulp.lpSum(self.shots_assign[(c, q)] for c in subcircuits) <= M_shots * self.use_q[q],
+                pulp.LpAffineExpression(shots_by_qpu[q]) <= M_shots * self.use_q[q],
                 f"UseQ_{q}_1"
             )
 
         # QPU capacity constraints (abilita[c,q])
-        BigM_d = len(self.vertices) + len(self.edges)  # Another big M for d[c]
+        # d[c] = a[c] + p[c] can not exceed the total weight plus one
+        # initialization per edge, so each QPU only needs a big M covering the
+        # gap between that bound and its capacity
+        max_d = sum(self.vertex_weights.values()) + len(self.edges)
+        BigM_q = [max(0, max_d - self.qpus[q].capacity) for q in qpus_index]
+
+        # a used subcircuit has at least one vertex and subcircuit 0 always
+        # holds the first one, so abilita[c,q] is fixed to 0 when that lower
+        # bound of d[c] already exceeds the capacity of QPU q
+        min_d = [min(self.vertex_weights.values())] * self.num_subcircuits
+        min_d[0] = max(min_d[0], self.vertex_weights[vertices[0]])
         for c in subcircuits:
             for q in qpus_index:
-                # d[c] <= qpus[q].capacity + BigM_d*(1 - abilita[c,q])
+                if min_d[c] > self.qpus[q].capacity:
+                    self.abilita[(c, q)].upBound = 0
+
+        for c in subcircuits:
+            for q in qpus_index:
+                # d[c] <= qpus[q].capacity + BigM_q[q]*(1 - abilita[c,q])
                 self.problem += (
-                    self.d[c] <= self.qpus[q].capacity + BigM_d*(1 - self.abilita[(c, q)]),
+                    self.d[c] <= self.qpus[q].capacity + BigM_q[q]*(1 - self.abilita[(c, q)]),
                     f"cap_{c}_{q}"
                 )
                 # If abilita[c,q] = 0 => shots_assign[c,q] = 0
@@ -283,27 +311,29 @@ class CutAndShootModel:
 
         # QPU usage time constraints
         for q in qpus_index:
+            # shared by the constraints below: queue_time * use_q[q] and
+            # sum of (shots_assign * execution_time)
+            queue_term = self.qpus[q].queue_time * self.use_q[q]
+            execution_time = self.qpus[q].execution_time
+            exec_expr = pulp.LpAffineExpression(
+                [(shots, execution_time) for shots, _ in shots_by_qpu[q]]
+            )
+
             # T_q[q] >= queue_time * use_q[q]
             self.problem += (
-                self.T_q[q] >= self.qpus[q].queue_time * self.use_q[q],
+                self.T_q[q] >= queue_term,
                 f"QueueTimeMin_q{q}"
             )
 
             # T_q[q] >= sum of (shots_assign * execution_time)
             self.problem += (
-                self.T_q[q] >= pulp.lpSum(
-                    self.shots_assign[(c, q)] * self.qpus[q].execution_time
-                    for c in subcircuits
-                ),
+                self.T_q[q] >= exec_expr,
                 f"ExecutionTimeMin_q{q}"
             )
 
             # T_q[q] <= (queue_time * use_q[q]) + sum(shots_assign * execution_time)
             self.problem += (
-                self.T_q[q] <= self.qpus[q].queue_time * self.use_q[q] + pulp.lpSum(
-                    self.shots_assign[(c, q)] * self.qpus[q].execution_time
-                    for c in subcircuits
-                ),
+                self.T_q[q] <= queue_term + exec_expr,
                 f"MaxTime_q{q}"
             )
 
@@ -313,6 +343,24 @@ class CutAndShootModel:
                 f"Makespan_{q}"
             )
 
+    def extend_constraints(self, constraints):
+        """
+        adds a batch of constraints to the model with a single extend, skipping
+        the per constraint bookkeeping of problem +=. extend would silently
+        replace a constraint with the same name, so overlapping names raise
+        here as they do with problem +=
+
+        :param constraints: a dictionary {name: constraint}
+        """
+        names = set()
+        for name, constraint in constraints.items():
+            # the name setter replaces the characters not allowed in LP names
+            constraint.name = name
+            if constraint.name in names or self.problem.get_constraint_by_name(constraint.name) is not None:
+                raise pulp.PulpError("overlapping constraint names: " + constraint.name)
+            names.add(constraint.name)
+        self.problem.extend(constraints.values())
+
     def build_objective_function(self):
         """
         objective function: alpha * (K_norm) + beta * (T_norm)
@@ -321,7 +369,7 @@ class CutAndShootModel:
           T = makespan
         """
         # number of cuts K
-        self.K = pulp.lpSum(self.x[e, c] for c in self.subcircuits for e in self.edges) / 2.0
+        self.K = pulp.LpAffineExpression([(x, 1) for x in self.x.values()]) / 2.0
         K_max = len(self.edges) / 2.0  # Max possible K if all edges were cut in every subcircuit
 
         # max T if all subcircuits + shots go to a single QPU with the worst time
@@ -340,16 +388,136 @@ class CutAndShootModel:
             "Minimize_Cuts_and_Makespan_Normalized"
         )
 
-    def solve_model(self, solver=None):
+    def set_warm_start(self):
+        """
+        sets a greedy initial solution: the vertices are split, in order, into
+        consecutive blocks that fit the largest QPU (so subcircuits are labelled
+        by their first vertex), and the shots of each block go to the QPU that
+        would finish them first
+        :return: True if the initial solution satisfies every constraint
+        """
+        max_capacity = max(qpu.capacity for qpu in self.qpus)
+        predecessors = {v: [] for v in self.vertices}
+        for src, dst in self.edges:
+            predecessors[dst].append(src)
+
+        # greedy partition, d grows by the vertex weight plus one
+        # initialization qubit per edge coming from a previous block
+        block = {}
+        c = 0
+        d_c = 0
+        for v in self.vertices:
+            d_v = self.vertex_weights[v] + sum(1 for u in predecessors[v] if block.get(u, c) < c)
+            if d_c > 0 and d_c + d_v > max_capacity:
+                c += 1
+                d_c = 0
+                d_v = self.vertex_weights[v] + sum(1 for u in predecessors[v] if u in block)
+                if c == self.num_subcircuits:
+                    return False
+            block[v] = c
+            d_c += d_v
+
+        a = [0] * self.num_subcircuits
+        p = [0] * self.num_subcircuits
+        o = [0] * self.num_subcircuits
+        for v, c in block.items():
+            a[c] += self.vertex_weights[v]
+        for e in self.edges:
+            c_src = block[e[0]]
+            c_dst = block[e[1]]
+            if c_src != c_dst:
+                o[c_src] += 1
+                p[c_dst] += 1
+        d = [a[c] + p[c] for c in self.subcircuits]
+        used = [c for c in self.subcircuits if a[c] > 0]
+
+        # all the shots of a subcircuit go to one QPU that can run it
+        shots_q = [0] * self.num_qpus
+        assignment = {}
+        for c in used:
+            candidates = [q for q in self.qpus_index if d[c] <= self.qpus[q].capacity]
+            if not candidates:
+                return False
+            q = min(
+                candidates,
+                key=lambda q: max(
+                    self.qpus[q].queue_time,
+                    (shots_q[q] + self.num_shots_per_subcircuit) * self.qpus[q].execution_time
+                )
+            )
+            shots_q[q] += self.num_shots_per_subcircuit
+            assignment[c] = q
+
+        for (v, c), var in self.y.items():
+            var.setInitialValue(1 if block[v] == c else 0)
+        for (e, c), var in self.x.items():
+            var.setInitialValue(1 if block[e[0]] != block[e[1]] and c in (block[e[0]], block[e[1]]) else 0)
+        for c in self.subcircuits:
+            self.a[c].setInitialValue(a[c])
+            self.p[c].setInitialValue(p[c])
+            self.o[c].setInitialValue(o[c])
+            self.f[c].setInitialValue(a[c] + p[c] - o[c])
+            self.d[c].setInitialValue(d[c])
+            self.u[c].setInitialValue(1 if c in assignment else 0)
+            for q in self.qpus_index:
+                shots = self.num_shots_per_subcircuit if assignment.get(c) == q else 0
+                self.shots_assign[(c, q)].setInitialValue(shots)
+                self.abilita[(c, q)].setInitialValue(1 if c in assignment and d[c] <= self.qpus[q].capacity else 0)
+
+        T_q = []
+        for q in self.qpus_index:
+            use = 1 if shots_q[q] > 0 else 0
+            T_q.append(max(
+                self.qpus[q].queue_time * use,
+                math.ceil(shots_q[q] * self.qpus[q].execution_time)
+            ))
+            self.use_q[q].setInitialValue(use)
+            self.T_q[q].setInitialValue(T_q[q])
+        self.T.setInitialValue(max(T_q))
+
+        return self.problem.valid()
+
+    def default_solver_class(self):
+        """
+        returns the first available solver in order of preference (Gurobi, HiGHS
+        command line, HiGHS through highspy, CBC),
+        the result is cached on the instance so detection runs only once
+        """
+        if self.solver_class is None:
+            self.solver_class = pulp.PULP_CBC_CMD
+            for solver_class in SOLVER_PREFERENCE:
+                if solver_class(msg=False).available():
+                    self.solver_class = solver_class
+                    break
+        return self.solver_class
+
+    def solve_model(self, solver=None, mip_gap=None, time_limit=None, threads=None, warm_start=False):
         """
         solves the model using the specified solver (or the default if none)
         :param solver: specific solver (None if default is to be used)
+        :param mip_gap: relative MIP gap at which the default solver stops
+        :param time_limit: time limit in seconds for the default solver
+        :param threads: number of threads for the default solver
+        :param warm_start: start the default solver from the greedy solution of set_warm_start
+            (skipped for solvers that do not take one, see SOLVER_OPTIONS)
         :return: the solver status and the optimal objective value
         """
-        if solver is not None:
-            self.problem.solve(solver)
-        else:
-            self.problem.solve(pulp.PULP_CBC_CMD(msg=False))
+        if solver is None:
+            solver_class = self.default_solver_class()
+            if warm_start and "warmStart" not in SOLVER_OPTIONS[solver_class]:
+                logger.warning("%s does not take a warm start, solving without it", solver_class.__name__)
+                warm_start = False
+            # the greedy solution is only passed on when it is feasible
+            warm_start = warm_start and self.set_warm_start()
+            options = {
+                "gapRel": mip_gap, "timeLimit": time_limit, "threads": threads,
+                "warmStart": warm_start
+            }
+            solver = solver_class(
+                msg=False,
+                **{name: options[name] for name in SOLVER_OPTIONS[solver_class]}
+            )
+        self.problem.solve(solver)
         return pulp.LpStatus[self.problem.status], pulp.value(self.problem.objective)
 
     def print_and_return_solution(self):
@@ -374,12 +542,19 @@ class CutAndShootModel:
         # result dictionary (only subcircuits with at least one vertex)
         subcircuits_data = {}
 
-        logger.info("Number of cuts: %.2f", pulp.value(self.K))
+        # solution values read once, instead of a pulp.value call per lookup
+        y_val = {key: var.varValue for key, var in self.y.items()}
+        x_val = {key: var.varValue for key, var in self.x.items()}
+        shots_val = {key: var.varValue for key, var in self.shots_assign.items()}
+        T_q_val = [self.T_q[q].varValue for q in self.qpus_index]
+        K_val = pulp.value(self.K)
+
+        logger.info("Number of cuts: %.2f", K_val)
 
         logger.info("Subcircuits (assigned vertices):")
         for c in self.subcircuits:
             # get vertices assigned to subcircuit c
-            subcircuit_vertices = [v for v in self.vertices if pulp.value(self.y[v, c]) == 1]
+            subcircuit_vertices = [v for v in self.vertices if y_val.get((v, c), 0) == 1]
 
             if not subcircuit_vertices:
                 continue
@@ -398,7 +573,7 @@ class CutAndShootModel:
 
             assignment = {}
             for q in self.qpus_index:
-                val = pulp.value(self.shots_assign[(c, q)])
+                val = shots_val[(c, q)]
                 if val > 0:
                     assignment[self.qpus[q].index] = int(val)
 
@@ -407,12 +582,12 @@ class CutAndShootModel:
 
         logger.info("\n-- QPU Usage --")
         for q in self.qpus_index:
-            t_q_val = pulp.value(self.T_q[q])
+            t_q_val = T_q_val[q]
             if t_q_val > 0:
-                total_shots = sum(pulp.value(self.shots_assign[(c, q)]) for c in self.subcircuits)
+                total_shots = sum(shots_val[(c, q)] for c in self.subcircuits)
                 logger.info(f"QPU {self.qpus[q].index}: T_q = {t_q_val:.2f}, total shots = {total_shots}")
 
-        T_val = pulp.value(self.T)
+        T_val = self.T.varValue
         logger.info(f"\nMakespan T = {T_val:.2f}")
 
         # counter for indexing cuts
@@ -423,11 +598,11 @@ class CutAndShootModel:
             if c not in subcircuits_data:
                 continue
 
-            subcircuits_data[c]['capacity'] = pulp.value(self.d[c])
-            subcircuits_data[c]['input_qubits'] = pulp.value(self.a[c])
-            subcircuits_data[c]['init_qubits'] = pulp.value(self.p[c])
-            subcircuits_data[c]['measured_qubits'] = pulp.value(self.o[c])
-            subcircuits_data[c]['contributing_qubits'] = pulp.value(self.f[c])
+            subcircuits_data[c]['capacity'] = self.d[c].varValue
+            subcircuits_data[c]['input_qubits'] = self.a[c].varValue
+            subcircuits_data[c]['init_qubits'] = self.p[c].varValue
+            subcircuits_data[c]['measured_qubits'] = self.o[c].varValue
+            subcircuits_data[c]['contributing_qubits'] = self.f[c].varValue
 
             subcircuits_data[c].update({"cuts": {"out": [], "in": []}})
             subcircuits_data[c].update({"cuts_info": {"out": [], "in": []}})
@@ -435,14 +610,14 @@ class CutAndShootModel:
 
 
             for e in self.edges:
-                if pulp.value(self.x[(e, c)]) > 0:
+                if x_val[(e, c)] > 0:
 
                     cut_info = {
                         "cut_id": cut_counter,
                         "edge": e # (source_vertex, target_vertex)
                     }
                     # if the edge is cut and the source belongs to subcircuit c, it's an out cut
-                    if pulp.value(self.y[e[0], c]) == 1:
+                    if y_val.get((e[0], c), 0) == 1:
                         subcircuits_data[c]["cuts"]["out"].append(e[0])
                         subcircuits_data[c]["cuts_info"]["out"].append(cut_info)
                         subcircuits_data[c]["role"].append("downstream")
@@ -461,4 +636,4 @@ class CutAndShootModel:
         for c, data in subcircuits_data.items():
             logger.info(f"Subcircuit {c} - In: {data['cuts']['in']}, Out: {data['cuts']['out']}")
 
-        return subcircuits_data, pulp.value(self.K)
+        return subcircuits_data, K_val
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from qiskit_aer import AerSimulator
 from qiskit_ibm_provider import IBMProvider
 
@@ -16,16 +18,32 @@ class QPU:
             self.capacity = 0
             self.backend_name = 'unknown'
 
+    # the backend lists are shared by all the QPUs, so they are fetched once
+    # (the IBM ones need a network round trip)
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _aer_backend_names():
+        return frozenset(b.name() for b in AerSimulator.backends())
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _ibm_provider():
+        return IBMProvider()
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _ibm_backend_names():
+        return frozenset(b.name for b in QPU._ibm_provider().backends())
+
     def _initialize_backend(self, qpu_type):
         """try to load either an AerSimulator or an IBM backend."""
         try:
             # check if it's a local simulator name (like "aer_simulator")
-            if qpu_type in [b.name() for b in AerSimulator.backends()]:
+            if qpu_type in QPU._aer_backend_names():
                 return AerSimulator()
             
-            provider = IBMProvider()
-            if qpu_type in [b.name for b in provider.backends()]:
-                return provider.get_backend(qpu_type)
+            if qpu_type in QPU._ibm_backend_names():
+                return QPU._ibm_provider().get_backend(qpu_type)
         except Exception as e:
             #print(f"[Warning] Failed to load backend '{qpu_type}': {e}")
             None
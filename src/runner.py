@@ -1,13 +1,14 @@
-from collections import defaultdict
-from qiskit import transpile, ClassicalRegister, QuantumCircuit
+from itertools import groupby
+from qiskit import ClassicalRegister, QuantumCircuit
 from qiskit.providers import Backend
 from typing import List, Tuple
-from copy import deepcopy
 import logging
+import numpy as np
 from qiskit.visualization import plot_histogram
 import matplotlib.pyplot as plt
 
 from subcircuit import Variant
+from transpiler import backend_key, transpile_cached
 
 # suppress Qiskit logs
 """ for handler in logging.root.handlers[:]:
@@ -17,52 +18,114 @@ logging.getLogger('qiskit').setLevel(logging.CRITICAL)
  """
 
 
+# operations each backend runs as they are, by backend key (None if its
+# circuits always need transpiling)
+native_operations_cache = {}
+
+
+def native_operations(backend: Backend):
+    """
+    operations a simulator without a coupling map executes directly, so
+    circuits made only of them do not need transpiling. None for any other backend
+    """
+    key = backend_key(backend)
+    if key not in native_operations_cache:
+        operations = None
+        target = getattr(backend, "target", None)
+        if target is not None:
+            if backend.coupling_map is None:
+                operations = frozenset(target.operation_names) | {"barrier"}
+        else:
+            config = backend.configuration()
+            if config.simulator and config.coupling_map is None:
+                operations = frozenset(config.basis_gates) | {"measure", "reset", "barrier"}
+        native_operations_cache[key] = operations
+
+    return native_operations_cache[key]
+
+
+def run_shots(run: Tuple[Variant, QuantumCircuit]) -> int:
+    # shots of a (variant, circuit to run) pair
+    return run[0].shots
+
 
 def run_circuit_list(
     circuit_list: List[Variant],
     backend: Backend
-) -> dict[str, dict[str, dict]]:
+) -> dict[str, dict]:
     """
     executes a list of quantum circuits with associated metadata.
 
     :param circuit_list: list of Variant
     :param backend: Qiskit backend
-    :return: dict mapping circuit name to execution results and metadata
+    :return: dict mapping circuit name to its outcomes as integers ('idx'), their
+        'counts', the bitstring width ('num_bits') and 'total_shots'
     """
     results = {}
-
-    grouped = defaultdict(list)
-    variant_map = {}
-
+    prepared = []
 
     for variant in circuit_list:
         qc = variant.circuit
         if qc.num_qubits == 0:
             continue
 
-        qc_copy = deepcopy(qc)
+        # only circuits without measurements are modified, so only those are copied
+        if not any(inst.operation.name == "measure" for inst in qc.data):
+            qc = qc.copy()
+            # only the active qubits are read out, one clbit each
+            active = variant.active_qubits
+            creg = ClassicalRegister(len(active), f"auto_meas_{variant.name}")
+            qc.add_register(creg)
+            qc.measure(active, range(len(active)))
+
+        prepared.append((variant, qc))
+
+    # circuits the backend runs as they are skip transpiling, the others do
+    # not depend on the shots, so they are transpiled in a single call (see
+    # transpile_cached)
+    native = native_operations(backend)
+    needs_transpile = [
+        native is None or not native.issuperset(inst.operation.name for inst in qc.data)
+        for _, qc in prepared
+    ]
+    transpiled = iter(transpile_cached(
+        [qc for (_, qc), needed in zip(prepared, needs_transpile) if needed], backend
+    ))
 
-        if qc_copy.count_ops().get("measure", 0) == 0:
-            creg = ClassicalRegister(qc_copy.num_qubits, f"auto_meas_{variant.name}")
-            qc_copy.add_register(creg)
-            for i in range(qc_copy.num_qubits):
-                qc_copy.measure(i, i)
+    # circuits to run with their variant, sorted by shots so each shot group
+    # is a contiguous run
+    runnable = sorted(
+        (
+            (variant, next(transpiled) if needed else qc)
+            for (variant, qc), needed in zip(prepared, needs_transpile)
+        ),
+        key=run_shots
+    )
 
-        grouped[variant.shots].append((variant.name, qc_copy))
-        variant_map[variant.name] = variant
+    # every job is submitted before waiting on any result, so the shot groups
+    # run (or queue) concurrently instead of one after the other
+    jobs = []
+    for shots, group in groupby(runnable, key=run_shots):
+        group = list(group)
+        names = [variant.name for variant, _ in group]
+        qcs = [qc for _, qc in group]
+        jobs.append((names, backend.run(qcs, shots=shots)))
 
-    for shots, group in grouped.items():
-        names, qcs = zip(*group)
-        transpiled = transpile(list(qcs), backend)
-        job = backend.run(transpiled, shots=shots)
+    for names, job in jobs:
         result = job.result()
 
+        # outcomes as integer indices with their counts, so they are parsed
+        # once here instead of by every consumer of the bitstrings
         for i, name in enumerate(names):
             counts = result.get_counts(i)
-            total_shots = sum(counts.values())
+            bitstrings = [bits.replace(' ', '') for bits in counts]
+            idx = np.fromiter((int(bits, 2) for bits in bitstrings), dtype=np.int64, count=len(bitstrings))
+            cnt = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
             results[name] = {
-                'counts': dict(counts),
-                'total_shots': total_shots
+                'idx': idx,
+                'counts': cnt,
+                'num_bits': len(bitstrings[0]) if bitstrings else 0,
+                'total_shots': int(cnt.sum())
             }
 
     return results
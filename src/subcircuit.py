@@ -2,6 +2,9 @@ from qiskit import QuantumCircuit
 
 
 class Subcircuit:
+    # many variants are created per subcircuit, slots keep them small
+    __slots__ = ('sub_id', 'vertices', 'cuts_info', 'qbit_map', 'shots')
+
     def __init__(self, sub_id: int, vertices: set, cuts_info: dict, qbit_map: dict, shots: int):
         self.sub_id = sub_id
         self.vertices = vertices
@@ -11,9 +14,11 @@ class Subcircuit:
 
 
     def __repr__(self):
-        return f"Subcircuit(id={self.sub_id}, vertices={list(self.vertices)}, cuts={self.cuts})"
+        return f"Subcircuit(id={self.sub_id}, vertices={list(self.vertices)}, cuts={self.cuts_info})"
 
 class Variant(Subcircuit):
+    __slots__ = ('circuit', 'name', 'active_qubits', 'initialized_info', 'measured_info')
+
     def __init__(
         self,
         sub_id: int,
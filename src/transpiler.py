@@ -0,0 +1,138 @@
+from threading import Lock
+from typing import List
+
+from qiskit import QuantumCircuit
+from qiskit.circuit import Barrier
+from qiskit.circuit.library import get_standard_gate_name_mapping
+from qiskit.providers import Backend
+from qiskit.transpiler import generate_preset_pass_manager
+
+
+# transpiled circuits by (structural key, backend key, optimization level),
+# least recently used entries evicted first
+transpile_cache = {}
+transpile_cache_lock = Lock()
+TRANSPILE_CACHE_SIZE = 256
+
+# preset pass managers by (backend key, optimization level), each with the
+# lock that guards it:
+# PassManager.run is not reentrant and the QPU threads can share a backend
+pass_managers = {}
+pass_managers_lock = Lock()
+
+# classes of the operations identified by their name alone. A custom gate can
+# reuse a standard name, so the class is checked too
+STANDARD_OPERATIONS = {name: type(op) for name, op in get_standard_gate_name_mapping().items()}
+STANDARD_OPERATIONS["barrier"] = Barrier
+
+
+def backend_name(backend: Backend) -> str:
+    # name is a property on BackendV2 and a method on BackendV1
+    return backend.name if isinstance(backend.name, str) else backend.name()
+
+
+def backend_key(backend: Backend):
+    # the name alone is not enough, backends sharing it can differ in their
+    # operations and coupling map. Calibrations are left out: a circuit
+    # transpiled for one of them still runs on the other
+    target = getattr(backend, "target", None)
+    if target is not None:
+        num_qubits, operations, coupling_map = target.num_qubits, target.operation_names, backend.coupling_map
+        edges = None if coupling_map is None else coupling_map.get_edges()
+    else:
+        config = backend.configuration()
+        num_qubits, operations, edges = config.n_qubits, config.basis_gates, config.coupling_map
+    return (
+        backend_name(backend),
+        num_qubits,
+        frozenset(operations),
+        None if edges is None else frozenset(map(tuple, edges)),
+    )
+
+
+def run_pass_manager(
+    circuits: List[QuantumCircuit],
+    backend: Backend,
+    optimization_level: int = 2
+) -> List[QuantumCircuit]:
+    # same passes as transpile(circuits, backend, optimization_level), but the
+    # preset pass manager is built once per backend instead of on every call
+    key = (backend_key(backend), optimization_level)
+    with pass_managers_lock:
+        if key not in pass_managers:
+            pass_managers[key] = (
+                generate_preset_pass_manager(optimization_level=optimization_level, backend=backend),
+                Lock()
+            )
+        pass_manager, lock = pass_managers[key]
+    with lock:
+        return pass_manager.run(circuits)
+
+
+def operation_key(operation):
+    # standard operations by their name, any other one by its name and
+    # definition. None if it has no definition (an opaque gate is not cached)
+    if type(operation) is STANDARD_OPERATIONS.get(operation.name):
+        return operation.name
+    definition = getattr(operation, "definition", None)
+    definition_key = None if definition is None else circuit_key(definition)
+    return None if definition_key is None else (operation.name, definition_key)
+
+
+def circuit_key(qc: QuantumCircuit):
+    # structural key of a circuit: register sizes, global phase, operations
+    # with their parameters and bits. None if some operation has no key or
+    # some parameter is not hashable (the circuit is not cached)
+    instructions = []
+    for inst in qc.data:
+        operation = operation_key(inst.operation)
+        if operation is None:
+            return None
+        instructions.append((
+            operation,
+            tuple(inst.operation.params),
+            tuple(qc.find_bit(qb).index for qb in inst.qubits),
+            tuple(qc.find_bit(cb).index for cb in inst.clbits),
+        ))
+    key = (qc.num_qubits, tuple(creg.size for creg in qc.cregs), qc.global_phase, tuple(instructions))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def transpile_cached(
+    circuits: List[QuantumCircuit],
+    backend: Backend,
+    optimization_level: int = 2
+) -> List[QuantumCircuit]:
+    # only the circuits not seen before on this backend are transpiled, all in
+    # a single call. The cache is shared by the threads running each QPU, so it
+    # is only accessed under the lock (transpile runs outside of it)
+    backend_id = backend_key(backend)
+    keys = [
+        (key, backend_id, optimization_level) if key is not None else None
+        for key in map(circuit_key, circuits)
+    ]
+    with transpile_cache_lock:
+        found = {key: transpile_cache[key] for key in keys if key is not None and key in transpile_cache}
+    pending = {key: qc for key, qc in zip(keys, circuits) if key is not None and key not in found}
+    uncached = [qc for key, qc in zip(keys, circuits) if key is None]
+
+    transpiled = (
+        run_pass_manager(list(pending.values()) + uncached, backend, optimization_level)
+        if pending or uncached else []
+    )
+    found.update(zip(pending, transpiled))
+    transpiled_uncached = iter(transpiled[len(pending):])
+
+    with transpile_cache_lock:
+        # reinserted at the end, as the most recently used
+        for key, transpiled_qc in found.items():
+            transpile_cache.pop(key, None)
+            transpile_cache[key] = transpiled_qc
+        while len(transpile_cache) > TRANSPILE_CACHE_SIZE:
+            transpile_cache.pop(next(iter(transpile_cache)))
+
+    return [next(transpiled_uncached) if key is None else found[key] for key in keys]